@@ -2,21 +2,32 @@
 Main backup orchestration engine
 """
 
+import io
+import sys
+import socket
 import logging
 import time
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
 from dataclasses import dataclass, field
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from netbackup.config import Config, Device
 from netbackup.device_manager import DeviceManager
 from netbackup.git_manager import GitManager
+from netbackup.ssh_pool import SSHConnectionPool
 
 logger = logging.getLogger(__name__)
 
+# Result objects are created per device; drop their __dict__ where dataclasses
+# support it (slots=True needs Python 3.10+)
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+# How long resolved device addresses, and failed lookups, are reused across runs
+DNS_CACHE_TTL_SECONDS = 300
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class DeviceBackupResult:
     """Result of backing up a single device"""
     device_name: str
@@ -30,7 +41,7 @@ class DeviceBackupResult:
     timestamp: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class BackupResult:
     """Overall backup operation result"""
     total_devices: int
@@ -43,21 +54,31 @@ class BackupResult:
     end_time: Optional[datetime] = None
     duration_seconds: float = 0.0
     
+    @classmethod
+    def empty(cls) -> 'BackupResult':
+        """Create a finalized result for a run that had no devices to back up"""
+        result = cls(total_devices=0, successful=0, failed=0, changed=0, unchanged=0)
+        result.finalize()
+        return result
+    
     def add_result(self, result: DeviceBackupResult):
-        """Add a device result and update counters"""
+        """Add a device result; counters are updated by finalize()"""
         self.device_results.append(result)
-        
-        if result.success:
-            self.successful += 1
-            if result.config_changed:
-                self.changed += 1
-            else:
-                self.unchanged += 1
-        else:
-            self.failed += 1
     
     def finalize(self):
-        """Finalize the backup result with timing"""
+        """Finalize the backup result with counters and timing"""
+        successful = changed = 0
+        for device_result in self.device_results:
+            if device_result.success:
+                successful += 1
+                if device_result.config_changed:
+                    changed += 1
+        
+        self.successful = successful
+        self.failed = len(self.device_results) - successful
+        self.changed = changed
+        self.unchanged = successful - changed
+        
         self.end_time = datetime.now()
         self.duration_seconds = (self.end_time - self.start_time).total_seconds()
 
@@ -65,16 +86,25 @@ class BackupResult:
 class BackupEngine:
     """Main backup orchestration engine"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, reuse_sessions: bool = False):
         """
         Initialize backup engine
         
         Args:
             config: Application configuration
+            reuse_sessions: Keep device connections open between runs (for long-lived engines)
         """
         self.config = config
         self.git_manager = GitManager(config.backup.repository_path)
         
+        # Idle device sessions kept between runs of a long-lived engine
+        self.session_pool = SSHConnectionPool(
+            config.backup.session_idle_ttl_seconds if reuse_sessions else 0
+        )
+        
+        # hostname -> (address, expiry as time.monotonic())
+        self._dns_cache: Dict[str, Tuple[Optional[str], float]] = {}
+        
     def initialize(self) -> bool:
         """
         Initialize backup system (Git repo, directories, etc.)
@@ -92,15 +122,21 @@ class BackupEngine:
         logger.info("Backup system initialized successfully")
         return True
     
+    def close(self):
+        """Release resources held between runs (pooled device connections)"""
+        self.session_pool.close_all()
+    
     def run_backup(self, 
                    device_filter: Optional[str] = None,
-                   group_filter: Optional[str] = None) -> BackupResult:
+                   group_filter: Optional[str] = None,
+                   include_diff: bool = True) -> BackupResult:
         """
         Run backup operation for devices
         
         Args:
             device_filter: Optional device name to backup only that device
             group_filter: Optional group name to backup only devices in that group
+            include_diff: Fetch diffs of changed configs into the results (needed for reports)
             
         Returns:
             BackupResult with operation results
@@ -108,9 +144,10 @@ class BackupEngine:
         # Determine which devices to backup
         if device_filter:
             device = self.config.get_device_by_name(device_filter)
-            devices = [device] if device else []
             if not device:
                 logger.error(f"Device not found: {device_filter}")
+                return BackupResult.empty()
+            devices = [device]
         elif group_filter:
             devices = self.config.get_devices_by_group(group_filter)
             if not devices:
@@ -120,26 +157,38 @@ class BackupEngine:
         
         if not devices:
             logger.error("No devices to backup")
-            return BackupResult(total_devices=0, successful=0, failed=0, changed=0, unchanged=0)
+            return BackupResult.empty()
         
         logger.info(f"Starting backup for {len(devices)} device(s)")
         
+        # One timestamp for the whole run: config filenames, commit message, results
+        run_timestamp = datetime.now()
+        
         # Initialize result
         result = BackupResult(
             total_devices=len(devices),
             successful=0,
             failed=0,
             changed=0,
-            unchanged=0
+            unchanged=0,
+            start_time=run_timestamp
         )
         
         # Backup devices concurrently
         max_workers = min(self.config.backup.concurrent_backups, len(devices))
         
+        # Resolve all hostnames up front so workers don't each wait on DNS
+        addresses = self._resolve_hosts(devices)
+        
+        # Devices whose saved configs still need committing: (result, config_hash, paths)
+        pending: List[Tuple[DeviceBackupResult, str, List[str]]] = []
+        
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit all backup jobs
             future_to_device = {
-                executor.submit(self._backup_device, device): device 
+                executor.submit(
+                    self._backup_device, device, run_timestamp, addresses.get(device.hostname)
+                ): device 
                 for device in devices
             }
             
@@ -147,24 +196,27 @@ class BackupEngine:
             for future in as_completed(future_to_device):
                 device = future_to_device[future]
                 try:
-                    device_result = future.result()
-                    result.add_result(device_result)
-                    
-                    # Log result
-                    if device_result.success:
-                        status = "CHANGED" if device_result.config_changed else "UNCHANGED"
-                        logger.info(f"✓ {device.name}: {status} ({device_result.duration_seconds:.1f}s)")
-                    else:
-                        logger.error(f"✗ {device.name}: FAILED - {device_result.error_message}")
-                        
+                    device_result, saved = future.result()
                 except Exception as e:
-                    logger.error(f"Unexpected error backing up {device.name}: {str(e)}")
-                    result.add_result(DeviceBackupResult(
+                    logger.error("Unexpected error backing up %s: %s", device.name, e)
+                    device_result, saved = DeviceBackupResult(
                         device_name=device.name,
                         hostname=device.hostname,
                         success=False,
-                        error_message=f"Unexpected error: {str(e)}"
-                    ))
+                        error_message=f"Unexpected error: {str(e)}",
+                        timestamp=run_timestamp
+                    ), None
+                
+                if saved is not None:
+                    pending.append((device_result, *saved))
+                else:
+                    self._record_result(result, device_result)
+        
+        # Commit all changed configurations at once
+        if pending:
+            self._commit_pending(pending, run_timestamp, include_diff)
+            for device_result, _, _ in pending:
+                self._record_result(result, device_result)
         
         # Finalize results
         result.finalize()
@@ -181,92 +233,203 @@ class BackupEngine:
         
         return result
     
-    def _backup_device(self, device: Device) -> DeviceBackupResult:
+    def _resolve_hosts(self, devices: Iterable[Device]) -> Dict[str, str]:
+        """
+        Resolve device hostnames concurrently, reusing cached addresses
+        
+        Failed lookups are cached for the same TTL, so a dead DNS name only
+        holds up the start of a run once per TTL rather than on every run.
+        
+        Args:
+            devices: Devices to resolve
+            
+        Returns:
+            Dictionary mapping hostname to IP address; unresolvable hosts are omitted
+        """
+        now = time.monotonic()
+        hostnames = {device.hostname for device in devices}
+        stale = [
+            hostname for hostname in hostnames
+            if hostname not in self._dns_cache or self._dns_cache[hostname][1] <= now
+        ]
+        
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(32, len(stale))) as executor:
+                for hostname, address in zip(stale, executor.map(self._resolve_host, stale)):
+                    self._dns_cache[hostname] = (address, now + DNS_CACHE_TTL_SECONDS)
+        
+        return {
+            hostname: self._dns_cache[hostname][0]
+            for hostname in hostnames if self._dns_cache[hostname][0]
+        }
+    
+    @staticmethod
+    def _resolve_host(hostname: str) -> Optional[str]:
+        """
+        Resolve a hostname to an IPv4 address
+        
+        Args:
+            hostname: Hostname or IP address
+            
+        Returns:
+            IP address, or None if it could not be resolved
+        """
+        try:
+            return socket.gethostbyname(hostname)
+        except OSError as e:
+            # Leave it to the connection attempt to report the failure
+            logger.debug("Could not resolve %s: %s", hostname, e)
+            return None
+    
+    def _record_result(self, result: BackupResult, device_result: DeviceBackupResult):
+        """
+        Add a finished device result to the overall result and log it
+        
+        Args:
+            result: Overall backup result
+            device_result: Result for a single device
+        """
+        result.add_result(device_result)
+        
+        if device_result.success:
+            status = "CHANGED" if device_result.config_changed else "UNCHANGED"
+            logger.info("✓ %s: %s (%.1fs)", device_result.device_name, status, device_result.duration_seconds)
+        else:
+            logger.error("✗ %s: FAILED - %s", device_result.device_name, device_result.error_message)
+    
+    def _commit_pending(self,
+                        pending: List[Tuple[DeviceBackupResult, str, List[str]]],
+                        run_timestamp: datetime,
+                        include_diff: bool = True):
+        """
+        Commit saved configurations for all changed devices in one Git commit
+        
+        Updates each device result with its diff, or marks it failed if the
+        commit could not be created.
+        
+        Args:
+            pending: List of (device result, config hash, saved paths) for saved configs
+            run_timestamp: Start time of the backup run
+            include_diff: Fetch diffs of the committed changes into the results
+        """
+        device_names = [device_result.device_name for device_result, _, _ in pending]
+        paths = [path for _, _, saved_paths in pending for path in saved_paths]
+        timestamp = run_timestamp.isoformat(sep=' ', timespec='seconds')
+        
+        if len(device_names) == 1:
+            commit_message = f"Backup: {device_names[0]} - {timestamp}"
+        else:
+            commit_message = f"Backup: {len(device_names)} devices - {timestamp}"
+        
+        if not self.git_manager.commit_batch(paths, commit_message):
+            for device_result, _, _ in pending:
+                device_result.success = False
+                device_result.error_message = "Failed to commit changes"
+            return
+        
+        diffs = self.git_manager.get_diffs(device_names) if include_diff else {}
+        
+        for device_result, config_hash, _ in pending:
+            # Record hash only once the config is committed
+            self.git_manager.save_config_hash(device_result.device_name, config_hash)
+            device_result.diff = diffs.get(device_result.device_name)
+    
+    def _backup_device(self,
+                       device: Device,
+                       run_timestamp: datetime,
+                       address: Optional[str] = None) -> Tuple[DeviceBackupResult, Optional[Tuple[str, List[str]]]]:
         """
         Backup a single device
         
+        Saves a changed configuration to disk but leaves committing to
+        run_backup, so all changed devices share one commit.
+        
         Args:
             device: Device to backup
+            run_timestamp: Start time of the backup run, used to name saved configs
+            address: Optional pre-resolved IP address to connect to
             
         Returns:
-            DeviceBackupResult
+            Tuple of (DeviceBackupResult, (config hash, saved paths) if the saved config awaits commit)
         """
         start_time = time.time()
         result = DeviceBackupResult(
             device_name=device.name,
             hostname=device.hostname,
-            success=False
+            success=False,
+            timestamp=run_timestamp
         )
         
         device_manager = None
+        saved = None
         
         try:
             # Connect to device
-            device_manager = DeviceManager(device)
+            device_manager = DeviceManager(device, address=address, pool=self.session_pool)
             if not device_manager.connect(
                 retry_attempts=self.config.backup.retry_attempts,
                 retry_delay=self.config.backup.retry_delay_seconds
             ):
                 result.error_message = "Failed to connect to device"
                 result.duration_seconds = time.time() - start_time
-                return result
+                return result, None
             
             # Retrieve configuration
             config = device_manager.get_config()
             if not config:
                 result.error_message = "Failed to retrieve configuration"
                 result.duration_seconds = time.time() - start_time
-                return result
+                return result, None
             
             result.config_size = len(config)
             
-            # Check if config has changed
-            has_changes = self.git_manager.has_changes(device.name, config)
+            # Check if config has changed; an unchanged hash skips the file compare
+            config_hash = self.git_manager.hash_config(config)
+            stored_hash = self.git_manager.get_config_hash(device.name)
+            if config_hash == stored_hash:
+                has_changes = False
+            else:
+                has_changes = self.git_manager.has_changes(device.name, config)
             result.config_changed = has_changes
             
             if has_changes:
                 # Save configuration
-                success, file_path = self.git_manager.save_config(
+                success, paths = self.git_manager.save_config(
                     device.name, 
                     config,
-                    datetime.now()
+                    run_timestamp
                 )
                 
                 if not success:
                     result.error_message = "Failed to save configuration"
                     result.duration_seconds = time.time() - start_time
-                    return result
-                
-                # Commit changes
-                commit_message = f"Backup: {device.name} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                if not self.git_manager.commit_changes(device.name, commit_message):
-                    result.error_message = "Failed to commit changes"
-                    result.duration_seconds = time.time() - start_time
-                    return result
+                    return result, None
                 
-                # Get diff
-                diff = self.git_manager.get_diff(device.name)
-                result.diff = diff
+                # Committed (and hash recorded) by run_backup
+                saved = (config_hash, paths)
                 
-                logger.debug(f"Configuration changed for {device.name}")
+                logger.debug("Configuration changed for %s", device.name)
             else:
-                logger.debug(f"No changes detected for {device.name}")
+                if config_hash != stored_hash:
+                    self.git_manager.save_config_hash(device.name, config_hash)
+                logger.debug("No changes detected for %s", device.name)
             
             # Success!
             result.success = True
             result.duration_seconds = time.time() - start_time
             
         except Exception as e:
-            logger.error(f"Error backing up {device.name}: {str(e)}")
+            logger.error("Error backing up %s: %s", device.name, e)
             result.error_message = str(e)
             result.duration_seconds = time.time() - start_time
+            saved = None
             
         finally:
-            # Always disconnect
+            # Always disconnect; a session that just failed is not worth keeping
             if device_manager:
-                device_manager.disconnect()
+                device_manager.disconnect(close=not result.success)
         
-        return result
+        return result, saved
     
     def test_device(self, device_name: str) -> bool:
         """
@@ -283,15 +446,27 @@ class BackupEngine:
             logger.error(f"Device not found: {device_name}")
             return False
         
-        logger.info(f"Testing connection to {device.name} ({device.hostname})...")
+        return self._test_one(device)
+    
+    def _test_one(self, device: Device) -> bool:
+        """
+        Test connection to a single device
+        
+        Args:
+            device: Device to test
+            
+        Returns:
+            True if connection successful, False otherwise
+        """
+        logger.info("Testing connection to %s (%s)...", device.name, device.hostname)
         
         device_manager = DeviceManager(device)
         success = device_manager.test_connection()
         
         if success:
-            logger.info(f"✓ Successfully connected to {device.name}")
+            logger.info("✓ Successfully connected to %s", device.name)
         else:
-            logger.error(f"✗ Failed to connect to {device.name}")
+            logger.error("✗ Failed to connect to %s", device.name)
         
         return success
     
@@ -312,14 +487,37 @@ class BackupEngine:
         
         logger.info(f"Testing connections to {len(devices)} device(s)...")
         
-        for device in devices:
-            success = self.test_device(device.name)
-            results['devices'][device.name] = success
+        if not devices:
+            return results
+        
+        # Test devices concurrently
+        max_workers = min(self.config.backup.concurrent_backups, len(devices))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_device = {
+                executor.submit(self._test_one, device): device
+                for device in devices
+            }
             
-            if success:
-                results['successful'] += 1
-            else:
-                results['failed'] += 1
+            for future in as_completed(future_to_device):
+                device = future_to_device[future]
+                try:
+                    success = future.result()
+                except Exception as e:
+                    logger.error("Unexpected error testing %s: %s", device.name, e)
+                    success = False
+                
+                results['devices'][device.name] = success
+                
+                if success:
+                    results['successful'] += 1
+                else:
+                    results['failed'] += 1
+        
+        # Keep inventory order for display
+        results['devices'] = {
+            device.name: results['devices'][device.name] for device in devices
+        }
         
         logger.info(f"\nTest Summary: {results['successful']}/{results['total']} successful")
         
@@ -352,69 +550,98 @@ class BackupEngine:
             'recent_history': history
         }
     
-    def generate_report(self, result: BackupResult) -> str:
+    def generate_report(self, result: BackupResult, out: Optional[TextIO] = None) -> Optional[str]:
         """
         Generate a human-readable report from backup results
         
         Args:
             result: BackupResult to generate report from
+            out: Optional text stream to write the report to
             
         Returns:
-            Formatted report as string
+            Formatted report as string, or None if written to out
         """
-        lines = []
-        lines.append("=" * 70)
-        lines.append("NETWORK DEVICE BACKUP REPORT")
-        lines.append("=" * 70)
-        lines.append(f"Start Time: {result.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append(f"End Time: {result.end_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append(f"Duration: {result.duration_seconds:.1f} seconds")
-        lines.append("")
-        lines.append("SUMMARY")
-        lines.append("-" * 70)
-        lines.append(f"Total Devices:    {result.total_devices}")
-        lines.append(f"Successful:       {result.successful}")
-        lines.append(f"Failed:           {result.failed}")
-        lines.append(f"Changed:          {result.changed}")
-        lines.append(f"Unchanged:        {result.unchanged}")
-        lines.append("")
+        stream = out if out is not None else io.StringIO()
+        
+        def write(*lines: str):
+            # One write per block of lines; write() alone emits a blank line
+            stream.write("\n".join(lines))
+            stream.write("\n")
+        
+        write(
+            "=" * 70,
+            "NETWORK DEVICE BACKUP REPORT",
+            "=" * 70,
+            f"Start Time: {result.start_time.isoformat(sep=' ', timespec='seconds')}",
+            f"End Time: {result.end_time.isoformat(sep=' ', timespec='seconds')}",
+            f"Duration: {result.duration_seconds:.1f} seconds",
+            "",
+            "SUMMARY",
+            "-" * 70,
+            f"Total Devices:    {result.total_devices}",
+            f"Successful:       {result.successful}",
+            f"Failed:           {result.failed}",
+            f"Changed:          {result.changed}",
+            f"Unchanged:        {result.unchanged}",
+            "",
+        )
+        
+        # Split results into sections in one pass
+        changed, unchanged, failed = [], [], []
+        for device_result in result.device_results:
+            if not device_result.success:
+                failed.append(device_result)
+            elif device_result.config_changed:
+                changed.append(device_result)
+            else:
+                unchanged.append(device_result)
         
         # Changed devices
-        if result.changed > 0:
-            lines.append("CHANGED CONFIGURATIONS")
-            lines.append("-" * 70)
-            for device_result in result.device_results:
-                if device_result.success and device_result.config_changed:
-                    lines.append(f"  • {device_result.device_name} ({device_result.hostname})")
-                    lines.append(f"    Size: {device_result.config_size} bytes")
-                    lines.append(f"    Duration: {device_result.duration_seconds:.1f}s")
-                    
-                    if device_result.diff:
-                        lines.append(f"    Changes detected (showing first 500 chars):")
-                        diff_preview = device_result.diff[:500]
-                        for line in diff_preview.split('\n'):
-                            lines.append(f"      {line}")
-                    lines.append("")
+        if changed:
+            write("CHANGED CONFIGURATIONS", "-" * 70)
+            for device_result in changed:
+                write(
+                    f"  • {device_result.device_name} ({device_result.hostname})",
+                    f"    Size: {device_result.config_size} bytes",
+                    f"    Duration: {device_result.duration_seconds:.1f}s",
+                )
+                
+                if device_result.diff:
+                    write(f"    Changes detected (showing first 500 chars):")
+                    # Walk lines of the first 500 chars in place, without
+                    # slicing a preview copy or splitting the whole diff
+                    diff = device_result.diff
+                    limit = min(len(diff), 500)
+                    start = 0
+                    while True:
+                        newline = diff.find("\n", start, limit)
+                        if newline == -1:
+                            write("      " + diff[start:limit])
+                            break
+                        write("      " + diff[start:newline])
+                        start = newline + 1
+                write()
         
         # Unchanged devices
-        if result.unchanged > 0:
-            lines.append("UNCHANGED CONFIGURATIONS")
-            lines.append("-" * 70)
-            for device_result in result.device_results:
-                if device_result.success and not device_result.config_changed:
-                    lines.append(f"  • {device_result.device_name} ({device_result.hostname})")
-            lines.append("")
+        if unchanged:
+            write("UNCHANGED CONFIGURATIONS", "-" * 70)
+            for device_result in unchanged:
+                write(f"  • {device_result.device_name} ({device_result.hostname})")
+            write()
         
         # Failed devices
-        if result.failed > 0:
-            lines.append("FAILED BACKUPS")
-            lines.append("-" * 70)
-            for device_result in result.device_results:
-                if not device_result.success:
-                    lines.append(f"  • {device_result.device_name} ({device_result.hostname})")
-                    lines.append(f"    Error: {device_result.error_message}")
-                    lines.append("")
-        
-        lines.append("=" * 70)
-        
-        return "\n".join(lines)
\ No newline at end of file
+        if failed:
+            write("FAILED BACKUPS", "-" * 70)
+            for device_result in failed:
+                write(
+                    f"  • {device_result.device_name} ({device_result.hostname})",
+                    f"    Error: {device_result.error_message}",
+                    "",
+                )
+        
+        # No trailing newline, matching the previous "\n".join() output
+        stream.write("=" * 70)
+        
+        if out is not None:
+            return None
+        return stream.getvalue()
@@ -7,11 +7,11 @@ import click
 from pathlib import Path
 
 from netbackup.config import Config
-from netbackup.backup_engine import BackupEngine
-from netbackup.notifier import Notifier
-from netbackup.scheduler import BackupScheduler
 from netbackup.utils import setup_logging, create_summary_table
 
+# BackupEngine, Notifier and BackupScheduler pull in netmiko/GitPython/APScheduler;
+# they are imported inside the commands that need them to keep startup fast
+
 
 @click.group()
 @click.option('--config-dir', default='./config', help='Configuration directory path')
@@ -28,6 +28,9 @@ def cli(ctx, config_dir):
 @click.pass_context
 def run(ctx, device, group):
     """Run backup operation"""
+    from netbackup.backup_engine import BackupEngine
+    from netbackup.notification import Notifier
+    
     config_dir = ctx.obj['config_dir']
     
     try:
@@ -38,6 +41,11 @@ def run(ctx, device, group):
         # Setup logging
         setup_logging(config.logging)
         
+        # An unknown name is an error, not an empty run
+        if device and not config.get_device_by_name(device):
+            click.echo(f"Device not found: {device}", err=True)
+            sys.exit(1)
+        
         # Initialize backup engine
         engine = BackupEngine(config)
         
@@ -57,6 +65,7 @@ def run(ctx, device, group):
         # Send notifications if configured
         notifier = Notifier(config.notifications)
         notifier.send_notifications(result, report)
+        notifier.close()
         
         # Exit with appropriate code
         if result.failed > 0:
@@ -77,6 +86,8 @@ def run(ctx, device, group):
 @click.pass_context
 def test(ctx, device):
     """Test device connections"""
+    from netbackup.backup_engine import BackupEngine
+    
     config_dir = ctx.obj['config_dir']
     
     try:
@@ -119,6 +130,8 @@ def test(ctx, device):
 @click.pass_context
 def status(ctx):
     """Show backup status for all devices"""
+    from netbackup.backup_engine import BackupEngine
+    
     config_dir = ctx.obj['config_dir']
     
     try:
@@ -142,29 +155,29 @@ def status(ctx):
         headers = ["Device", "Hostname", "Groups", "Last Backup", "Status"]
         rows = []
         
+        # One git log for all devices instead of a history walk per device
+        last_backups = engine.git_manager.get_all_last_backup_times()
+        
         for device in devices:
-            status_info = engine.get_device_status(device.name)
+            last_backup = last_backups.get(device.name)
+            if last_backup:
+                last_backup_str = last_backup.isoformat(sep=' ', timespec='minutes')
+                status_str = "✓"
+            else:
+                last_backup_str = "Never"
+                status_str = "○"
+            
+            groups_str = ", ".join(device.groups[:2])
+            if len(device.groups) > 2:
+                groups_str += "..."
             
-            if status_info:
-                last_backup = status_info['last_backup']
-                if last_backup:
-                    last_backup_str = last_backup.strftime('%Y-%m-%d %H:%M')
-                    status_str = "✓"
-                else:
-                    last_backup_str = "Never"
-                    status_str = "○"
-                
-                groups_str = ", ".join(status_info['groups'][:2])
-                if len(status_info['groups']) > 2:
-                    groups_str += "..."
-                
-                rows.append([
-                    device.name,
-                    device.hostname,
-                    groups_str,
-                    last_backup_str,
-                    status_str
-                ])
+            rows.append([
+                device.name,
+                device.hostname,
+                groups_str,
+                last_backup_str,
+                status_str
+            ])
         
         # Display table
         table = create_summary_table(headers, rows)
@@ -182,6 +195,8 @@ def status(ctx):
 @click.pass_context
 def history(ctx, device, limit):
     """Show backup history for a device"""
+    from netbackup.backup_engine import BackupEngine
+    
     config_dir = ctx.obj['config_dir']
     
     try:
@@ -213,7 +228,7 @@ def history(ctx, device, limit):
         
         # Display history
         for entry in history_entries[:limit]:
-            click.echo(f"  {entry['date'].strftime('%Y-%m-%d %H:%M:%S')} - {entry['hash']}")
+            click.echo(f"  {entry['date'].isoformat(sep=' ', timespec='seconds')} - {entry['hash']}")
             click.echo(f"    {entry['message']}")
             click.echo()
         
@@ -227,6 +242,8 @@ def history(ctx, device, limit):
 @click.pass_context
 def diff(ctx, device):
     """Show latest config changes for a device"""
+    from netbackup.backup_engine import BackupEngine
+    
     config_dir = ctx.obj['config_dir']
     
     try:
@@ -302,6 +319,8 @@ def list_devices(ctx):
 @click.pass_context
 def schedule(ctx, daemon):
     """Start scheduled backup jobs"""
+    from netbackup.scheduler import BackupScheduler
+    
     config_dir = ctx.obj['config_dir']
     
     try:
@@ -409,6 +428,8 @@ def init(ctx, repo_path):
 @click.pass_context
 def test_notifications(ctx, email, slack):
     """Test notification configuration"""
+    from netbackup.notification import Notifier
+    
     config_dir = ctx.obj['config_dir']
     
     try:
@@ -423,7 +444,9 @@ def test_notifications(ctx, email, slack):
         
         if email:
             click.echo("Sending test email...")
-            if notifier.send_test_email():
+            sent = notifier.send_test_email()
+            notifier.close()
+            if sent:
                 click.echo("✓ Test email sent successfully")
             else:
                 click.echo("✗ Failed to send test email", err=True)
@@ -3,15 +3,70 @@ Configuration management for network backup system
 """
 
 import os
+import functools
 import yaml
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
-from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field, fields
 from dotenv import load_dotenv
 
+try:
+    # libyaml C parser, several times faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # Load environment variables
 load_dotenv()
 
+@functools.lru_cache(maxsize=None)
+def _env(key: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Look up an environment variable, memoized for the current load
+    
+    Inventories mostly share a few credential variables, so each name is
+    only read once. The cache is cleared at the start of Config.load().
+    
+    Args:
+        key: Variable name (empty means unset)
+        default: Value returned when the variable is not set
+        
+    Returns:
+        Variable value or default
+    """
+    return os.getenv(key, default) if key else default
+
+
+# Parsed YAML files, reused until the file changes: path -> (mtime_ns, size, data)
+_YAML_CACHE: Dict[str, Tuple[int, int, Any]] = {}
+
+
+def _load_yaml_cached(path: Path) -> Any:
+    """
+    Parse a YAML file, reusing the previous result if the file is unchanged
+    
+    The returned data is shared between calls and must not be mutated.
+    
+    Args:
+        path: YAML file path
+        
+    Returns:
+        Parsed YAML data
+    """
+    stat = path.stat()
+    key = str(path)
+    
+    cached = _YAML_CACHE.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    
+    with open(path, 'r') as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+    
+    _YAML_CACHE[key] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
 
 @dataclass
 class Device:
@@ -35,6 +90,7 @@ class BackupSettings:
     timeout_seconds: int = 30
     retry_attempts: int = 3
     retry_delay_seconds: int = 5
+    session_idle_ttl_seconds: int = 0
 
 
 @dataclass
@@ -81,6 +137,33 @@ class LoggingSettings:
     backup_count: int = 5
 
 
+# Field names of each settings dataclass, used to filter YAML sections
+_FIELDS = {
+    cls: frozenset(f.name for f in fields(cls))
+    for cls in (BackupSettings, ScheduleSettings, EmailSettings, SlackSettings, LoggingSettings)
+}
+
+
+def _settings_from(cls, data: Optional[dict], **overrides):
+    """
+    Build a settings dataclass from a YAML section
+    
+    Unknown keys are ignored and missing keys keep the dataclass defaults.
+    
+    Args:
+        cls: Settings dataclass
+        data: YAML section (may be None)
+        **overrides: Values that take precedence over the section
+        
+    Returns:
+        Settings instance
+    """
+    names = _FIELDS[cls]
+    values = {key: value for key, value in (data or {}).items() if key in names}
+    values.update(overrides)
+    return cls(**values)
+
+
 class Config:
     """Main configuration class"""
     
@@ -92,8 +175,15 @@ class Config:
         self.notifications: NotificationSettings = NotificationSettings()
         self.logging: LoggingSettings = LoggingSettings()
         
+        # Lookup indexes over self.devices, see _rebuild_indexes()
+        self._by_name: Dict[str, Device] = {}
+        self._by_group: Dict[str, List[Device]] = defaultdict(list)
+        self._enabled: List[Device] = []
+        
     def load(self):
         """Load configuration from YAML files"""
+        # Pick up environment changes made since the previous load
+        _env.cache_clear()
         self._load_devices()
         self._load_settings()
         
@@ -107,28 +197,31 @@ class Config:
                 f"Copy devices.yaml.example to devices.yaml and configure your devices."
             )
         
-        with open(devices_file, 'r') as f:
-            data = yaml.safe_load(f)
+        data = _load_yaml_cached(devices_file)
         
         # Load credentials
         credentials = data.get('credentials', {})
         default_creds = credentials.get('default', {})
         
-        default_username = os.getenv(default_creds.get('username_env', ''))
-        default_password = os.getenv(default_creds.get('password_env', ''))
+        default_username = _env(default_creds.get('username_env', ''))
+        default_password = _env(default_creds.get('password_env', ''))
         
-        # Load devices
+        # Load devices (replacing any from a previous load)
+        self.devices = []
         for device_data in data.get('devices', []):
-            # Get device-specific or default credentials
-            device_creds = credentials.get(device_data['name'], default_creds)
-            username = os.getenv(device_creds.get('username_env', ''), default_username)
-            password = os.getenv(device_creds.get('password_env', ''), default_password)
+            # Get device-specific or default credentials (already resolved above)
+            device_creds = credentials.get(device_data['name'])
+            if device_creds is None:
+                username, password = default_username, default_password
+            else:
+                username = _env(device_creds.get('username_env', ''), default_username)
+                password = _env(device_creds.get('password_env', ''), default_password)
             
             device = Device(
                 name=device_data['name'],
                 hostname=device_data['hostname'],
                 device_type=device_data['device_type'],
-                groups=device_data.get('groups', []),
+                groups=list(device_data.get('groups') or []),
                 enabled=device_data.get('enabled', True),
                 username=username,
                 password=password,
@@ -136,6 +229,21 @@ class Config:
                 timeout=device_data.get('timeout', 30)
             )
             self.devices.append(device)
+        
+        self._rebuild_indexes()
+    
+    def _rebuild_indexes(self):
+        """Rebuild device lookup indexes; call after self.devices changes"""
+        self._by_name = {}
+        self._by_group = defaultdict(list)
+        self._enabled = []
+        for device in self.devices:
+            # First definition wins for duplicate names
+            self._by_name.setdefault(device.name, device)
+            if device.enabled:
+                self._enabled.append(device)
+                for group in device.groups:
+                    self._by_group[group].append(device)
     
     def _load_settings(self):
         """Load application settings"""
@@ -145,70 +253,46 @@ class Config:
             # Use defaults
             return
         
-        with open(settings_file, 'r') as f:
-            data = yaml.safe_load(f)
+        data = _load_yaml_cached(settings_file)
         
         # Backup settings
-        backup_data = data.get('backup', {})
-        self.backup = BackupSettings(
-            repository_path=backup_data.get('repository_path', './backups/repo'),
-            concurrent_backups=backup_data.get('concurrent_backups', 3),
-            timeout_seconds=backup_data.get('timeout_seconds', 30),
-            retry_attempts=backup_data.get('retry_attempts', 3),
-            retry_delay_seconds=backup_data.get('retry_delay_seconds', 5)
-        )
+        self.backup = _settings_from(BackupSettings, data.get('backup'))
         
         # Schedule settings
-        schedule_data = data.get('schedule', {})
-        self.schedule = ScheduleSettings(
-            enabled=schedule_data.get('enabled', False),
-            cron_expression=schedule_data.get('cron_expression', '0 2 * * *')
-        )
+        self.schedule = _settings_from(ScheduleSettings, data.get('schedule'))
         
-        # Notification settings
-        notif_data = data.get('notifications', {})
-        
-        email_data = notif_data.get('email', {})
-        email = EmailSettings(
-            enabled=email_data.get('enabled', False),
-            smtp_server=email_data.get('smtp_server', ''),
-            smtp_port=email_data.get('smtp_port', 587),
-            smtp_use_tls=email_data.get('smtp_use_tls', True),
-            from_address=email_data.get('from_address', ''),
-            to_addresses=email_data.get('to_addresses', []),
-            username=os.getenv(email_data.get('username_env', ''), ''),
-            password=os.getenv(email_data.get('password_env', ''), '')
+        # Notification settings (secrets come from the environment, never the file)
+        notif_data = data.get('notifications') or {}
+        
+        email_data = notif_data.get('email') or {}
+        email = _settings_from(
+            EmailSettings,
+            email_data,
+            to_addresses=list(email_data.get('to_addresses') or []),
+            username=_env(email_data.get('username_env', ''), ''),
+            password=_env(email_data.get('password_env', ''), '')
         )
         
-        slack_data = notif_data.get('slack', {})
-        slack = SlackSettings(
-            enabled=slack_data.get('enabled', False),
-            webhook_url=os.getenv(slack_data.get('webhook_url_env', ''), '')
+        slack_data = notif_data.get('slack') or {}
+        slack = _settings_from(
+            SlackSettings,
+            slack_data,
+            webhook_url=_env(slack_data.get('webhook_url_env', ''), '')
         )
         
         self.notifications = NotificationSettings(email=email, slack=slack)
         
         # Logging settings
-        log_data = data.get('logging', {})
-        self.logging = LoggingSettings(
-            level=log_data.get('level', 'INFO'),
-            file=log_data.get('file', './logs/netbackup.log'),
-            console=log_data.get('console', True),
-            max_bytes=log_data.get('max_bytes', 10485760),
-            backup_count=log_data.get('backup_count', 5)
-        )
+        self.logging = _settings_from(LoggingSettings, data.get('logging'))
     
     def get_enabled_devices(self) -> List[Device]:
         """Get list of enabled devices"""
-        return [d for d in self.devices if d.enabled]
+        return list(self._enabled)
     
     def get_devices_by_group(self, group: str) -> List[Device]:
         """Get devices belonging to a specific group"""
-        return [d for d in self.devices if group in d.groups and d.enabled]
+        return list(self._by_group.get(group, []))
     
     def get_device_by_name(self, name: str) -> Optional[Device]:
         """Get a specific device by name"""
-        for device in self.devices:
-            if device.name == name:
-                return device
-        return None
\ No newline at end of file
+        return self._by_name.get(name)
\ No newline at end of file
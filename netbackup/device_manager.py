@@ -4,6 +4,7 @@ Network device connection and configuration retrieval
 
 import logging
 import time
+import functools
 from typing import Optional
 from netmiko import ConnectHandler
 from netmiko.exceptions import NetmikoTimeoutException, NetmikoAuthenticationException
@@ -14,16 +15,38 @@ logger = logging.getLogger(__name__)
 class DeviceManager:
     """Manages connection and communication with network devices"""
     
-    def __init__(self, device):
+    # Device type substring -> command that prints the running configuration
+    _CMD_TABLE = {
+        'cisco_ios': 'show running-config',
+        'juniper': 'show configuration',
+        'arista': 'show running-config',
+        'hp_comware': 'display current-configuration',
+        'aruba': 'display current-configuration',
+    }
+    _DEFAULT_CMD = 'show running-config'
+    
+    def __init__(self, device, address: Optional[str] = None, pool=None):
         """
         Initialize device manager
         
         Args:
             device: Device configuration object
+            address: Optional pre-resolved IP address to use instead of device.hostname
+            pool: Optional SSHConnectionPool to reuse connections from and return them to
         """
         self.device = device
+        self.address = address
+        self.pool = pool
         self.connection = None
         self._connected = False
+        # send_command bound to the config command, set once connected
+        self._fetch = None
+        
+        # Resolve the config command once rather than on every retrieval
+        self._show_cmd = next(
+            (cmd for key, cmd in self._CMD_TABLE.items() if key in device.device_type),
+            self._DEFAULT_CMD
+        )
         
     def connect(self, retry_attempts: int = 3, retry_delay: int = 5) -> bool:
         """
@@ -36,9 +59,19 @@ class DeviceManager:
         Returns:
             True if connection successful, False otherwise
         """
+        # Reuse an idle session if the pool has one
+        if self.pool:
+            connection = self.pool.acquire(self.device)
+            if connection:
+                self.connection = connection
+                self._connected = True
+                self._bind_fetch()
+                logger.info(f"Reusing connection to {self.device.name}")
+                return True
+        
         device_params = {
             'device_type': self.device.device_type,
-            'host': self.device.hostname,
+            'host': self.address or self.device.hostname,
             'username': self.device.username,
             'password': self.device.password,
             'port': self.device.port,
@@ -51,6 +84,7 @@ class DeviceManager:
                 logger.info(f"Connecting to {self.device.name} ({self.device.hostname}) - Attempt {attempt}/{retry_attempts}")
                 self.connection = ConnectHandler(**device_params)
                 self._connected = True
+                self._bind_fetch()
                 logger.info(f"Successfully connected to {self.device.name}")
                 return True
                 
@@ -78,6 +112,10 @@ class DeviceManager:
         
         return False
     
+    def _bind_fetch(self):
+        """Bind the config command to the current connection"""
+        self._fetch = functools.partial(self.connection.send_command, self._show_cmd)
+    
     def get_config(self) -> Optional[str]:
         """
         Retrieve running configuration from device
@@ -91,19 +129,7 @@ class DeviceManager:
         
         try:
             logger.info(f"Retrieving configuration from {self.device.name}")
-            
-            # Different commands for different device types
-            if 'cisco_ios' in self.device.device_type:
-                config = self.connection.send_command('show running-config')
-            elif 'juniper' in self.device.device_type:
-                config = self.connection.send_command('show configuration')
-            elif 'arista' in self.device.device_type:
-                config = self.connection.send_command('show running-config')
-            elif 'hp_comware' in self.device.device_type or 'aruba' in self.device.device_type:
-                config = self.connection.send_command('display current-configuration')
-            else:
-                # Default to show running-config for unknown types
-                config = self.connection.send_command('show running-config')
+            config = self._fetch()
             
             if not config or len(config.strip()) == 0:
                 logger.error(f"Retrieved empty configuration from {self.device.name}")
@@ -116,8 +142,20 @@ class DeviceManager:
             logger.error(f"Error retrieving config from {self.device.name}: {str(e)}")
             return None
     
-    def disconnect(self):
-        """Close connection to device"""
+    def disconnect(self, close: bool = False):
+        """
+        Close connection to device, or return it to the pool if one is set
+        
+        Args:
+            close: Close the connection even if a pool is set
+        """
+        if self.connection and self._connected and self.pool and not close:
+            self.pool.release(self.device, self.connection)
+            self._connected = False
+            self.connection = None
+            self._fetch = None
+            return
+        
         if self.connection and self._connected:
             try:
                 self.connection.disconnect()
@@ -127,6 +165,7 @@ class DeviceManager:
             finally:
                 self._connected = False
                 self.connection = None
+                self._fetch = None
     
     def test_connection(self) -> bool:
         """
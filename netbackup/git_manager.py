@@ -3,10 +3,11 @@ Git repository management for configuration versioning
 """
 
 import os
+import hashlib
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 import git
 from git import Repo, InvalidGitRepositoryError
 
@@ -25,6 +26,12 @@ class GitManager:
         """
         self.repo_path = Path(repo_path)
         self.repo: Optional[Repo] = None
+        # Content hashes of the last saved config per device; kept inside .git
+        # so they are never staged alongside the backups themselves
+        self.hash_dir = self.repo_path / ".git" / "netbackup"
+        # Device name -> commits touching its latest.txt, newest first, as
+        # (hexsha, author, commit time, message); built lazily, see _get_history_index()
+        self._history_index: Optional[Dict[str, List[Tuple[str, str, int, str]]]] = None
         
     def initialize_repo(self) -> bool:
         """
@@ -63,7 +70,7 @@ class GitManager:
             logger.error(f"Failed to initialize Git repository: {str(e)}")
             return False
     
-    def save_config(self, device_name: str, config: str, timestamp: Optional[datetime] = None) -> Tuple[bool, Optional[str]]:
+    def save_config(self, device_name: str, config: str, timestamp: Optional[datetime] = None) -> Tuple[bool, List[str]]:
         """
         Save device configuration to repository
         
@@ -73,11 +80,11 @@ class GitManager:
             timestamp: Optional timestamp (uses current time if not provided)
             
         Returns:
-            Tuple of (success: bool, file_path: str or None)
+            Tuple of (success: bool, paths written relative to the repo root)
         """
         if not self.repo:
             logger.error("Git repository not initialized")
-            return False, None
+            return False, []
         
         try:
             if timestamp is None:
@@ -92,26 +99,89 @@ class GitManager:
             config_filename = f"config_{timestamp_str}.txt"
             config_path = device_dir / config_filename
             
-            # Also maintain a "latest" symlink or copy
+            # Also maintain a "latest" hardlink (or copy)
             latest_path = device_dir / "latest.txt"
             
             # Write configuration
-            with open(config_path, 'w') as f:
-                f.write(config)
+            self._write_atomic(config_path, config)
             
-            # Update latest
-            with open(latest_path, 'w') as f:
-                f.write(config)
+            # Update latest by linking to the file just written
+            self._link_atomic(config_path, latest_path, config)
             
             logger.info(f"Saved configuration for {device_name} to {config_path}")
             
-            # Return relative path from repo root
-            rel_path = config_path.relative_to(self.repo_path)
-            return True, str(rel_path)
+            # Return relative paths from repo root, ready for staging
+            return True, [
+                str(config_path.relative_to(self.repo_path)),
+                str(latest_path.relative_to(self.repo_path)),
+            ]
             
         except Exception as e:
             logger.error(f"Failed to save config for {device_name}: {str(e)}")
-            return False, None
+            return False, []
+    
+    @staticmethod
+    def _write_atomic(path: Path, content: str):
+        """
+        Write file via a temporary file in the same directory and rename it
+        into place, so readers never see a partially written config
+        
+        Args:
+            path: Destination file path
+            content: File content
+        """
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            # Encode once and write the bytes directly, bypassing the text layer
+            payload = memoryview(content.encode('utf-8'))
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                while payload:
+                    payload = payload[os.write(fd, payload):]
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    @classmethod
+    def _link_atomic(cls, source: Path, path: Path, content: str):
+        """
+        Point path at the same file as source without writing the content again
+        
+        The link is made under a temporary name and renamed into place. Falls
+        back to writing a copy where hardlinks are not supported.
+        
+        Args:
+            source: Existing file to link to
+            path: Destination file path
+            content: File content, used for the fallback copy
+        """
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            # Clear a leftover from an interrupted run, which would make os.link fail
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            cls._write_atomic(path, content)
+            return
+        
+        try:
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
     
     def commit_changes(self, device_name: str, message: Optional[str] = None) -> bool:
         """
@@ -121,6 +191,25 @@ class GitManager:
             device_name: Name of device
             message: Optional commit message
             
+        Returns:
+            True if successful, False otherwise
+        """
+        if message is None:
+            timestamp = datetime.now().isoformat(sep=" ", timespec="seconds")
+            message = f"Backup: {device_name} - {timestamp}"
+        
+        # The whole device directory is staged, so it may match HEAD already
+        return self.commit_batch([str(Path("backups") / device_name)], message, skip_unchanged=True)
+    
+    def commit_batch(self, paths: List[str], message: str, skip_unchanged: bool = False) -> bool:
+        """
+        Commit files for several devices to Git in a single commit
+        
+        Args:
+            paths: Paths returned by save_config, relative to the repo root
+            message: Commit message
+            skip_unchanged: Check the index against HEAD and skip the commit if nothing changed
+            
         Returns:
             True if successful, False otherwise
         """
@@ -129,29 +218,67 @@ class GitManager:
             return False
         
         try:
-            # Add device directory to staging
-            device_dir = Path("backups") / device_name
-            self.repo.index.add([str(device_dir)])
+            # Stage exactly the files just written in one index update, without
+            # walking each device's history of configs. Freshly saved files are
+            # always new, so only callers staging other paths need the HEAD diff
+            self.repo.index.add(paths)
             
-            # Check if there are changes to commit
-            if not self.repo.index.diff("HEAD"):
-                logger.info(f"No changes to commit for {device_name}")
+            if skip_unchanged and not self.repo.index.diff("HEAD"):
+                logger.info("No changes to commit")
                 return True
             
-            # Create commit message
-            if message is None:
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                message = f"Backup: {device_name} - {timestamp}"
-            
-            # Commit
             self.repo.index.commit(message)
-            logger.info(f"Committed changes for {device_name}")
+            self._history_index = None
+            logger.info(f"Committed {len(paths)} file(s)")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to commit changes for {device_name}: {str(e)}")
+            logger.error(f"Failed to commit {len(paths)} file(s): {str(e)}")
             return False
     
+    def get_diffs(self, device_names: List[str], compare_to: str = "HEAD~1") -> Dict[str, str]:
+        """
+        Get diffs for several devices with a single git invocation
+        
+        Args:
+            device_names: Names of devices
+            compare_to: Git reference to compare against (default: previous commit)
+            
+        Returns:
+            Dictionary mapping device name to its diff; devices without a diff are omitted
+        """
+        if not self.repo:
+            logger.error("Git repository not initialized")
+            return {}
+        
+        wanted = set(device_names)
+        diffs: Dict[str, List[str]] = {}
+        
+        try:
+            # Keep non-ASCII device names unquoted so the headers below parse
+            output = self.repo.git(c="core.quotePath=false").diff(
+                compare_to, "HEAD", "--", "backups/*/latest.txt"
+            )
+        except git.exc.GitCommandError as e:
+            logger.error(f"Failed to get diffs: {str(e)}")
+            return {}
+        
+        # Split combined output on per-file headers: diff --git a/backups/<name>/latest.txt b/...
+        current = None
+        for line in output.splitlines():
+            if line.startswith("diff --git "):
+                # A header that does not match must not leak into the previous device
+                current = None
+                if line.startswith("diff --git a/backups/"):
+                    path = line[len("diff --git a/"):].split(" b/", 1)[0]
+                    name = path[len("backups/"):-len("/latest.txt")]
+                    if name in wanted:
+                        current = diffs.setdefault(name, [])
+            if current is not None:
+                current.append(line)
+        
+        return {name: "\n".join(lines) for name, lines in diffs.items()}
+    
     def get_diff(self, device_name: str, compare_to: str = "HEAD~1") -> Optional[str]:
         """
         Get diff for device configuration
@@ -196,18 +323,66 @@ class GitManager:
         if not self.repo:
             return None
         
+        commits = self._get_history_index().get(device_name)
+        if commits:
+            return datetime.fromtimestamp(commits[0][2])
+        return None
+    
+    def get_all_last_backup_times(self) -> Dict[str, datetime]:
+        """
+        Get timestamp of last backup for every device with a single git log
+        
+        Returns:
+            Dictionary mapping device name to datetime of its last backup
+        """
+        if not self.repo:
+            return {}
+        
+        return {
+            device_name: datetime.fromtimestamp(commits[0][2])
+            for device_name, commits in self._get_history_index().items()
+        }
+    
+    def _get_history_index(self) -> Dict[str, List[Tuple[str, str, int, str]]]:
+        """
+        Get per-device backup history, reading the whole log with one git call
+        
+        The index is reused until the next commit.
+        
+        Returns:
+            Dictionary mapping device name to its commits, newest first
+        """
+        if self._history_index is not None:
+            return self._history_index
+        
+        index: Dict[str, List[Tuple[str, str, int, str]]] = {}
+        
         try:
-            device_path = f"backups/{device_name}/latest.txt"
-            
-            # Get last commit that modified this file
-            commits = list(self.repo.iter_commits(paths=device_path, max_count=1))
-            if commits:
-                return datetime.fromtimestamp(commits[0].committed_date)
-            return None
+            # One record per commit: RS, then hash/author/time/message separated
+            # by US, followed by the latest.txt paths the commit touched.
+            # Paths are left unquoted so non-ASCII device names match below
+            output = self.repo.git(c="core.quotePath=false").log(
+                "--format=%x1e%H%x1f%an%x1f%ct%x1f%B%x1f",
+                "--name-only",
+                "--",
+                "backups/*/latest.txt"
+            )
+            
+            for record in output.split("\x1e")[1:]:
+                hexsha, author, committed, rest = record.split("\x1f", 3)
+                message, paths = rest.rsplit("\x1f", 1)
+                commit = (hexsha, author, int(committed), message.strip())
+                
+                for line in paths.splitlines():
+                    if line.startswith("backups/") and line.endswith("/latest.txt"):
+                        index.setdefault(line[len("backups/"):-len("/latest.txt")], []).append(commit)
             
         except Exception as e:
-            logger.error(f"Failed to get last backup time for {device_name}: {str(e)}")
-            return None
+            logger.error(f"Failed to read backup history: {str(e)}")
+            return {}
+        
+        self._history_index = index
+        return index
     
     def has_changes(self, device_name: str, new_config: str) -> bool:
         """
@@ -227,17 +402,108 @@ class GitManager:
                 # No previous backup exists
                 return True
             
-            with open(latest_path, 'r') as f:
-                old_config = f.read()
-            
-            # Compare configs
-            return old_config.strip() != new_config.strip()
+            # Compare digests rather than holding both configs in memory
+            return self._hash_file(latest_path) != self.hash_config(new_config)
             
         except Exception as e:
             logger.warning(f"Error comparing configs for {device_name}: {str(e)}")
             # Assume changed to be safe
             return True
     
+    @staticmethod
+    def hash_config(config: str) -> str:
+        """
+        Compute content hash of a configuration
+        
+        Leading/trailing whitespace is ignored, matching has_changes().
+        
+        Args:
+            config: Configuration content
+            
+        Returns:
+            Hex digest string
+        """
+        return hashlib.blake2b(config.strip().encode('utf-8'), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        """
+        Compute hash_config() of a file's content, reading it in chunks
+        
+        Args:
+            path: File path
+            
+        Returns:
+            Hex digest string
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        # Whitespace is held back until more content follows, so trailing
+        # whitespace never reaches the digest (leading is dropped up front)
+        pending = b''
+        started = False
+        
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                if not started:
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                    started = True
+                
+                body = chunk.rstrip()
+                if body:
+                    digest.update(pending)
+                    digest.update(body)
+                    pending = chunk[len(body):]
+                else:
+                    pending += chunk
+        
+        return digest.hexdigest()
+    
+    def get_config_hash(self, device_name: str) -> Optional[str]:
+        """
+        Get stored content hash of the last saved config for device
+        
+        Args:
+            device_name: Name of device
+            
+        Returns:
+            Hex digest string, or None if no hash is stored
+        """
+        try:
+            return (self.hash_dir / f"{device_name}.hash").read_text().strip() or None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Error reading config hash for {device_name}: {str(e)}")
+            return None
+    
+    def save_config_hash(self, device_name: str, config_hash: str) -> bool:
+        """
+        Store content hash of the last saved config for device
+        
+        Args:
+            device_name: Name of device
+            config_hash: Hex digest from hash_config()
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            self.hash_dir.mkdir(parents=True, exist_ok=True)
+            hash_path = self.hash_dir / f"{device_name}.hash"
+            tmp_path = hash_path.with_suffix(".tmp")
+            
+            # Write then rename so a crash never leaves a truncated hash
+            with open(tmp_path, 'w') as f:
+                f.write(config_hash)
+            os.replace(tmp_path, hash_path)
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Failed to save config hash for {device_name}: {str(e)}")
+            return False
+    
     def get_history(self, device_name: str, limit: int = 10) -> List[dict]:
         """
         Get commit history for device
@@ -252,21 +518,12 @@ class GitManager:
         if not self.repo:
             return []
         
-        try:
-            device_path = f"backups/{device_name}/latest.txt"
-            commits = list(self.repo.iter_commits(paths=device_path, max_count=limit))
-            
-            history = []
-            for commit in commits:
-                history.append({
-                    'hash': commit.hexsha[:7],
-                    'message': commit.message.strip(),
-                    'author': str(commit.author),
-                    'date': datetime.fromtimestamp(commit.committed_date),
-                })
-            
-            return history
-            
-        except Exception as e:
-            logger.error(f"Failed to get history for {device_name}: {str(e)}")
-            return []
\ No newline at end of file
+        return [
+            {
+                'hash': hexsha[:7],
+                'message': message,
+                'author': author,
+                'date': datetime.fromtimestamp(committed),
+            }
+            for hexsha, author, committed, message in self._get_history_index().get(device_name, [])[:limit]
+        ]
\ No newline at end of file
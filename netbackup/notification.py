@@ -2,22 +2,129 @@
 Notification handling for backup results
 """
 
+import functools
 import logging
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional
-import requests
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Callable, List, NamedTuple, Optional
 
 from netbackup.config import NotificationSettings
-from netbackup.backup_engine import BackupResult
+
+if TYPE_CHECKING:
+    import smtplib
+    import requests
+    from netbackup.backup_engine import BackupResult
+
+# requests, smtplib and email are imported on first use: a notifier with a
+# channel disabled never pays for loading that channel's libraries. BackupResult
+# is only needed for annotations, which keeps netmiko and GitPython unloaded too
 
 logger = logging.getLogger(__name__)
 
 
+class _Status(NamedTuple):
+    """Outcome of a backup run as presented by every notification channel"""
+    label: str  # Email subject suffix
+    emoji: str
+    color: str  # Slack attachment color
+    ts: int  # Run start as a Unix timestamp
+
+
+def _classify(result: "BackupResult") -> _Status:
+    """
+    Classify a backup result once for all channels
+    
+    Args:
+        result: Backup result
+        
+    Returns:
+        Status shared by the email and Slack notifications
+    """
+    ts = int(result.start_time.timestamp())
+    
+    if result.failed > 0:
+        return _Status("⚠️  FAILED", "⚠️", "#ff9900", ts)  # Orange
+    if result.changed > 0:
+        return _Status("✓ SUCCESS (Changes Detected)", "✓", "#36a64f", ts)  # Green
+    return _Status("✓ SUCCESS (No Changes)", "✓", "#808080", ts)  # Gray
+
+
+@functools.lru_cache(maxsize=None)
+def _deadline_smtp() -> type:
+    """
+    Build the SMTP session class on first use, keeping smtplib a lazy import
+    
+    Returns:
+        smtplib.SMTP subclass that caps each command's socket timeout by `deadline`
+    """
+    import smtplib
+    
+    class DeadlineSMTP(smtplib.SMTP):
+        """SMTP session whose commands all finish by a shared deadline"""
+        
+        # time.monotonic() value after which no further command is sent
+        deadline = float("inf")
+        
+        def send(self, s):
+            # Every command, and the message data, goes through here; the reply is
+            # read on the same socket, so the timeout covers the round trip
+            if self.sock is not None:
+                remaining = self.deadline - time.monotonic()
+                if remaining <= 0:
+                    self.close()
+                    raise TimeoutError("SMTP deadline exceeded")
+                self.sock.settimeout(min(self.timeout, remaining))
+            super().send(s)
+    
+    return DeadlineSMTP
+
+
 class Notifier:
     """Handles sending notifications via email and Slack"""
     
+    # Default end-to-end budget for send_notifications, retries included
+    SEND_TIMEOUT_SECONDS = 15
+    # Upper bounds per network operation, further capped by the remaining budget:
+    # SMTP socket timeout, and Slack webhook (connect, read) timeouts, in seconds
+    SMTP_TIMEOUT = 8
+    SLACK_TIMEOUT = (3, 7)
+    # Attempts per notification and base delay for full-jitter backoff between them
+    RETRY_ATTEMPTS = 3
+    RETRY_BASE_DELAY = 0.2
+    # Consecutive failed notifications before a channel is skipped, and for how long
+    BREAKER_THRESHOLD = 3
+    BREAKER_COOLDOWN_SECONDS = 60
+    # HTTP statuses worth retrying: rate limiting and server-side errors
+    _RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+    
+    # Summary fields of the Slack report, in display order (values set by _send_slack())
+    _SLACK_FIELD_TITLES = ("Total Devices", "Successful", "Failed", "Changed", "Duration")
+    
+    # Email body, filled in by _format_email_body()
+    _EMAIL_TEMPLATE = "\n".join([
+        "Network Device Backup Report",
+        "=" * 70,
+        "",
+        "QUICK SUMMARY",
+        "-" * 70,
+        "Total Devices:    {total}",
+        "Successful:       {successful}",
+        "Failed:           {failed}",
+        "Changed:          {changed}",
+        "Unchanged:        {unchanged}",
+        "Duration:         {duration:.1f}s",
+        "",
+        "",
+        "DETAILED REPORT",
+        "-" * 70,
+        "{report}",
+        "",
+        "-" * 70,
+        "This is an automated message from the Network Backup System",
+        "DW Solution - Network Automation Services",
+    ])
+    
     def __init__(self, settings: NotificationSettings):
         """
         Initialize notifier
@@ -26,119 +133,280 @@ class Notifier:
             settings: Notification configuration
         """
         self.settings = settings
+        # Open SMTP session reused across sends, see _get_smtp()
+        self._smtp: Optional["smtplib.SMTP"] = None
+        # Keep-alive HTTP session for webhook posts, see _get_http()
+        self._http: Optional["requests.Session"] = None
+        # Circuit breaker state per channel: consecutive failures, skip until (time.monotonic())
+        self._breakers = {
+            'email': {'fail': 0, 'open_until': 0.0},
+            'slack': {'fail': 0, 'open_until': 0.0},
+        }
+        # Sends still running after send_notifications() returned; close() waits for them
+        self._pending: List[Future] = []
+    
+    def close(self):
+        """Close the pooled SMTP session and any open HTTP connections"""
+        # A late send may still be using (or about to store) the sessions below
+        wait(self._pending)
+        self._pending = []
+        
+        if self._http is not None:
+            self._http.close()
+        
+        if self._smtp is None:
+            return
+        
+        import smtplib
+        
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        finally:
+            self._smtp = None
+    
+    def _get_http(self) -> "requests.Session":
+        """
+        Get the HTTP session, creating it on first use
+        
+        Returns:
+            Keep-alive session, so repeated webhook posts skip the TCP/TLS handshake
+        """
+        if self._http is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            
+            self._http = requests.Session()
+            self._http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+        
+        return self._http
+    
+    def _get_smtp(self, deadline: float) -> "smtplib.SMTP":
+        """
+        Get a connected SMTP session, reusing the open one while it is alive
+        
+        Args:
+            deadline: time.monotonic() value by which every command of the session
+                (until the next call) must be done
+        
+        Returns:
+            SMTP session with TLS and login already done
+        """
+        import smtplib
+        
+        if self._smtp is not None:
+            try:
+                self._smtp.deadline = deadline
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                self._discard_smtp()
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("SMTP deadline exceeded")
+        
+        server = _deadline_smtp()(
+            self.settings.email.smtp_server,
+            self.settings.email.smtp_port,
+            timeout=min(self.SMTP_TIMEOUT, remaining)
+        )
+        # The connect above used what was left of the budget; later commands are
+        # each capped at SMTP_TIMEOUT and by the deadline
+        server.timeout = self.SMTP_TIMEOUT
+        server.deadline = deadline
+        try:
+            if self.settings.email.smtp_use_tls:
+                server.starttls()
+            
+            if self.settings.email.username and self.settings.email.password:
+                server.login(self.settings.email.username, self.settings.email.password)
+        except BaseException:
+            server.close()
+            raise
+        
+        self._smtp = server
+        return server
+    
+    def _discard_smtp(self):
+        """Drop the pooled SMTP session without a clean QUIT (it may be broken)"""
+        if self._smtp is not None:
+            self._smtp.close()
+            self._smtp = None
     
-    def send_notifications(self, result: BackupResult, report: str):
+    def _call_with_retry(self,
+                         channel: str,
+                         send: Callable[[float], None],
+                         is_transient: Callable[[Exception], bool],
+                         deadline: float):
+        """
+        Call send, retrying transient failures, unless the channel's breaker is open
+        
+        Args:
+            channel: Channel name ('email' or 'slack')
+            send: Function performing one delivery attempt within the given seconds
+            is_transient: Tells whether a failed attempt is worth retrying
+            deadline: time.monotonic() value by which delivery must be done
+            
+        Raises:
+            RuntimeError: If the channel is skipped by its open breaker
+            TimeoutError: If the deadline passed before an attempt could start
+            Exception: The last error if all attempts failed
+        """
+        breaker = self._breakers[channel]
+        if time.monotonic() < breaker['open_until']:
+            raise RuntimeError(f"{channel} skipped after {breaker['fail']} consecutive failures")
+        
+        for attempt in range(self.RETRY_ATTEMPTS):
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"{channel} notification deadline exceeded")
+                
+                send(remaining)
+                breaker['fail'] = 0
+                return
+            except Exception as e:
+                delay = random.uniform(0, self.RETRY_BASE_DELAY * 2 ** attempt)
+                if (attempt + 1 < self.RETRY_ATTEMPTS and is_transient(e)
+                        and time.monotonic() + delay < deadline):
+                    time.sleep(delay)
+                    continue
+                
+                breaker['fail'] += 1
+                if breaker['fail'] >= self.BREAKER_THRESHOLD:
+                    breaker['open_until'] = time.monotonic() + self.BREAKER_COOLDOWN_SECONDS
+                raise
+    
+    @classmethod
+    def _is_transient_http(cls, error: Exception) -> bool:
+        """Check whether a failed webhook post is worth retrying (never client errors)"""
+        import requests
+        
+        if isinstance(error, requests.HTTPError):
+            return error.response is not None and error.response.status_code in cls._RETRY_STATUS
+        return isinstance(error, (requests.ConnectionError, requests.Timeout))
+    
+    @staticmethod
+    def _is_transient_smtp(error: Exception) -> bool:
+        """Check whether a failed email send is worth retrying (never auth or rejected mail)"""
+        import smtplib
+        
+        if isinstance(error, smtplib.SMTPResponseException):
+            # 4xx replies are temporary by definition
+            return 400 <= error.smtp_code < 500
+        if isinstance(error, smtplib.SMTPServerDisconnected):
+            return True
+        # Other SMTP errors (e.g. refused recipients) will not change on retry
+        return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+    
+    def send_notifications(self, result: "BackupResult", report: str, timeout: Optional[float] = None):
         """
         Send all configured notifications
         
         Args:
             result: Backup result
             report: Formatted report text
+            timeout: Seconds allowed for all channels, retries included
+                (default SEND_TIMEOUT_SECONDS); the call returns once they are up,
+                and close() waits for any send still finishing
         """
+        if timeout is None:
+            timeout = self.SEND_TIMEOUT_SECONDS
+        deadline = time.monotonic() + timeout
+        status = _classify(result)
+        
+        senders = []
         if self.settings.email.enabled:
-            self._send_email(result, report)
+            senders.append(self._send_email)
         
         if self.settings.slack.enabled:
-            self._send_slack(result, report)
+            senders.append(self._send_slack)
+        
+        if not senders:
+            return
+        
+        # Email and Slack are independent round trips; send them side by side. Even a
+        # single channel runs on a worker, so the wait below returns at the deadline
+        executor = ThreadPoolExecutor(max_workers=len(senders), thread_name_prefix="notify")
+        try:
+            futures = [executor.submit(send, result, report, status, deadline) for send in senders]
+            _, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            if not_done:
+                logger.warning("%d notification(s) still pending after %ss", len(not_done), timeout)
+                self._pending.extend(not_done)
+        finally:
+            executor.shutdown(wait=False)
     
-    def _send_email(self, result: BackupResult, report: str):
+    def _send_email(self, result: "BackupResult", report: str, status: _Status, deadline: float):
         """
         Send email notification
         
         Args:
             result: Backup result
             report: Formatted report text
+            status: Classification of the result
+            deadline: time.monotonic() value by which sending must be done
         """
+        from email.message import EmailMessage
+        
         try:
             # Create message
-            msg = MIMEMultipart()
+            msg = EmailMessage()
             msg['From'] = self.settings.email.from_address
             msg['To'] = ', '.join(self.settings.email.to_addresses)
+            msg['Subject'] = f"Network Backup Report - {status.label}"
             
-            # Determine subject based on results
-            if result.failed > 0:
-                status = "⚠️  FAILED"
-            elif result.changed > 0:
-                status = "✓ SUCCESS (Changes Detected)"
-            else:
-                status = "✓ SUCCESS (No Changes)"
-            
-            msg['Subject'] = f"Network Backup Report - {status}"
-            
-            # Create email body
-            body = self._format_email_body(result, report)
-            msg.attach(MIMEText(body, 'plain'))
+            # Create email body; quoted-printable keeps the report's non-ASCII
+            # symbols 7-bit safe for relays without 8BITMIME
+            msg.set_content(self._format_email_body(result, report), cte='quoted-printable')
             
             # Send email
-            with smtplib.SMTP(self.settings.email.smtp_server, self.settings.email.smtp_port) as server:
-                if self.settings.email.smtp_use_tls:
-                    server.starttls()
-                
-                if self.settings.email.username and self.settings.email.password:
-                    server.login(self.settings.email.username, self.settings.email.password)
-                
-                server.send_message(msg)
+            def send(remaining: float):
+                try:
+                    self._get_smtp(deadline).send_message(msg)
+                except Exception:
+                    self._discard_smtp()
+                    raise
+            
+            self._call_with_retry('email', send, self._is_transient_smtp, deadline)
             
             logger.info("Email notification sent successfully")
             
         except Exception as e:
-            logger.error(f"Failed to send email notification: {str(e)}")
+            logger.error("Failed to send email notification: %s", e)
     
-    def _send_slack(self, result: BackupResult, report: str):
+    def _send_slack(self, result: "BackupResult", report: str, status: _Status, deadline: float):
         """
         Send Slack notification
         
         Args:
             result: Backup result
             report: Formatted report text
+            status: Classification of the result
+            deadline: time.monotonic() value by which sending must be done
         """
         try:
-            # Determine emoji and color based on results
-            if result.failed > 0:
-                emoji = "⚠️"
-                color = "#ff9900"  # Orange
-            elif result.changed > 0:
-                emoji = "✓"
-                color = "#36a64f"  # Green
-            else:
-                emoji = "✓"
-                color = "#808080"  # Gray
-            
             # Create Slack message
+            values = (
+                str(result.total_devices),
+                str(result.successful),
+                str(result.failed),
+                str(result.changed),
+                f"{result.duration_seconds:.1f}s",
+            )
             message = {
                 "attachments": [
                     {
-                        "color": color,
-                        "title": f"{emoji} Network Backup Report",
+                        "color": status.color,
+                        "title": f"{status.emoji} Network Backup Report",
                         "fields": [
-                            {
-                                "title": "Total Devices",
-                                "value": str(result.total_devices),
-                                "short": True
-                            },
-                            {
-                                "title": "Successful",
-                                "value": str(result.successful),
-                                "short": True
-                            },
-                            {
-                                "title": "Failed",
-                                "value": str(result.failed),
-                                "short": True
-                            },
-                            {
-                                "title": "Changed",
-                                "value": str(result.changed),
-                                "short": True
-                            },
-                            {
-                                "title": "Duration",
-                                "value": f"{result.duration_seconds:.1f}s",
-                                "short": True
-                            }
+                            {"title": title, "value": value, "short": True}
+                            for title, value in zip(self._SLACK_FIELD_TITLES, values)
                         ],
                         "footer": "Network Backup System",
-                        "ts": int(result.start_time.timestamp())
+                        "ts": status.ts
                     }
                 ]
             }
@@ -155,19 +423,23 @@ class Notifier:
                 })
             
             # Send to Slack
-            response = requests.post(
-                self.settings.slack.webhook_url,
-                json=message,
-                timeout=10
-            )
-            response.raise_for_status()
+            def send(remaining: float):
+                connect_timeout, read_timeout = self.SLACK_TIMEOUT
+                response = self._get_http().post(
+                    self.settings.slack.webhook_url,
+                    json=message,
+                    timeout=(min(connect_timeout, remaining), min(read_timeout, remaining))
+                )
+                response.raise_for_status()
+            
+            self._call_with_retry('slack', send, self._is_transient_http, deadline)
             
             logger.info("Slack notification sent successfully")
             
         except Exception as e:
-            logger.error(f"Failed to send Slack notification: {str(e)}")
+            logger.error("Failed to send Slack notification: %s", e)
     
-    def _format_email_body(self, result: BackupResult, report: str) -> str:
+    def _format_email_body(self, result: "BackupResult", report: str) -> str:
         """
         Format email body
         
@@ -178,35 +450,15 @@ class Notifier:
         Returns:
             Email body as string
         """
-        lines = []
-        lines.append("Network Device Backup Report")
-        lines.append("=" * 70)
-        lines.append("")
-        
-        # Quick summary
-        lines.append("QUICK SUMMARY")
-        lines.append("-" * 70)
-        lines.append(f"Total Devices:    {result.total_devices}")
-        lines.append(f"Successful:       {result.successful}")
-        lines.append(f"Failed:           {result.failed}")
-        lines.append(f"Changed:          {result.changed}")
-        lines.append(f"Unchanged:        {result.unchanged}")
-        lines.append(f"Duration:         {result.duration_seconds:.1f}s")
-        lines.append("")
-        
-        # Add full report
-        lines.append("")
-        lines.append("DETAILED REPORT")
-        lines.append("-" * 70)
-        lines.append(report)
-        
-        # Footer
-        lines.append("")
-        lines.append("-" * 70)
-        lines.append("This is an automated message from the Network Backup System")
-        lines.append("DW Solution - Network Automation Services")
-        
-        return "\n".join(lines)
+        return self._EMAIL_TEMPLATE.format(
+            total=result.total_devices,
+            successful=result.successful,
+            failed=result.failed,
+            changed=result.changed,
+            unchanged=result.unchanged,
+            duration=result.duration_seconds,
+            report=report
+        )
     
     def send_test_email(self) -> bool:
         """
@@ -215,8 +467,10 @@ class Notifier:
         Returns:
             True if successful, False otherwise
         """
+        from email.message import EmailMessage
+        
         try:
-            msg = MIMEMultipart()
+            msg = EmailMessage()
             msg['From'] = self.settings.email.from_address
             msg['To'] = ', '.join(self.settings.email.to_addresses)
             msg['Subject'] = "Network Backup System - Test Email"
@@ -225,22 +479,16 @@ class Notifier:
             body += "If you received this, your email configuration is working correctly.\n\n"
             body += "DW Solution - Network Automation Services"
             
-            msg.attach(MIMEText(body, 'plain'))
+            msg.set_content(body, cte='quoted-printable')
             
-            with smtplib.SMTP(self.settings.email.smtp_server, self.settings.email.smtp_port) as server:
-                if self.settings.email.smtp_use_tls:
-                    server.starttls()
-                
-                if self.settings.email.username and self.settings.email.password:
-                    server.login(self.settings.email.username, self.settings.email.password)
-                
-                server.send_message(msg)
+            self._get_smtp(time.monotonic() + self.SEND_TIMEOUT_SECONDS).send_message(msg)
             
             logger.info("Test email sent successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send test email: {str(e)}")
+            self._discard_smtp()
+            logger.error("Failed to send test email: %s", e)
             return False
     
     def send_test_slack(self) -> bool:
@@ -262,10 +510,10 @@ class Notifier:
                 ]
             }
             
-            response = requests.post(
+            response = self._get_http().post(
                 self.settings.slack.webhook_url,
                 json=message,
-                timeout=10
+                timeout=self.SLACK_TIMEOUT
             )
             response.raise_for_status()
             
@@ -273,5 +521,5 @@ class Notifier:
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send test Slack message: {str(e)}")
+            logger.error("Failed to send test Slack message: %s", e)
             return False
\ No newline at end of file
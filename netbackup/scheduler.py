@@ -3,12 +3,15 @@ Job scheduling for automated backups
 """
 
 import logging
-from apscheduler.schedulers.blocking import BlockingScheduler
+import signal
+import threading
+from typing import Optional
+from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from netbackup.config import Config
 from netbackup.backup_engine import BackupEngine
-from netbackup.notifier import Notifier
+from netbackup.notification import Notifier
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +27,18 @@ class BackupScheduler:
             config: Application configuration
         """
         self.config = config
-        self.scheduler = BlockingScheduler()
-        self.backup_engine = BackupEngine(config)
+        # A run that overlaps the next fire time makes that fire wait (or be folded
+        # into one catch-up run) instead of starting a second concurrent backup
+        self.scheduler = BackgroundScheduler(job_defaults={
+            'coalesce': True,
+            'max_instances': 1,
+            'misfire_grace_time': 300,
+        })
+        self._stop_event = threading.Event()
+        # Trigger parsed from schedule.cron_expression by setup()
+        self._trigger: Optional[CronTrigger] = None
+        # One engine for the life of the scheduler, so device sessions carry over between runs
+        self.backup_engine = BackupEngine(config, reuse_sessions=True)
         self.notifier = Notifier(config.notifications)
     
     def setup(self):
@@ -39,33 +52,25 @@ class BackupScheduler:
             logger.error("Failed to initialize backup system")
             return False
         
-        # Parse cron expression
-        cron_parts = self.config.schedule.cron_expression.split()
-        if len(cron_parts) != 5:
-            logger.error(f"Invalid cron expression: {self.config.schedule.cron_expression}")
+        # Parse cron expression once; the trigger is kept for later reuse
+        try:
+            self._trigger = CronTrigger.from_crontab(self.config.schedule.cron_expression)
+        except ValueError as e:
+            logger.error("Invalid cron expression: %s (%s)", self.config.schedule.cron_expression, e)
             return False
         
-        minute, hour, day, month, day_of_week = cron_parts
-        
-        # Create cron trigger
-        trigger = CronTrigger(
-            minute=minute,
-            hour=hour,
-            day=day,
-            month=month,
-            day_of_week=day_of_week
-        )
-        
         # Add job to scheduler
         self.scheduler.add_job(
             self._run_scheduled_backup,
-            trigger=trigger,
+            trigger=self._trigger,
             id='backup_job',
             name='Network Device Backup',
-            replace_existing=True
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1
         )
         
-        logger.info(f"Scheduled backup job: {self.config.schedule.cron_expression}")
+        logger.info("Scheduled backup job: %s", self.config.schedule.cron_expression)
         return True
     
     def start(self):
@@ -77,31 +82,76 @@ class BackupScheduler:
         logger.info("Starting backup scheduler...")
         logger.info("Press Ctrl+C to exit")
         
+        self._stop_event.clear()
+        previous_handlers = self._install_signal_handlers()
+        
         try:
             self.scheduler.start()
+            # Jobs run on the scheduler's own threads; park here until asked to stop
+            self._stop_event.wait()
         except (KeyboardInterrupt, SystemExit):
+            pass
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            if self.scheduler.running:
+                # Let a backup that is already running finish
+                self.scheduler.shutdown(wait=True)
+            self.backup_engine.close()
             logger.info("Scheduler stopped")
     
+    def stop(self):
+        """Ask a running start() to shut down"""
+        self._stop_event.set()
+    
+    def _install_signal_handlers(self) -> dict:
+        """
+        Make SIGINT/SIGTERM stop the scheduler
+        
+        Returns:
+            Previous handlers by signal number, empty if not on the main thread
+        """
+        # Python only allows signal handlers on the main thread
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+        
+        previous = {}
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous[signum] = signal.signal(signum, lambda *_: self.stop())
+        return previous
+    
     def _run_scheduled_backup(self):
         """Execute scheduled backup job"""
         logger.info("Running scheduled backup...")
         
         try:
-            # Run backup
-            result = self.backup_engine.run_backup()
+            # The report (and the diffs in it) is only used by notifications
+            notifications = self.config.notifications
+            notify = notifications.email.enabled or notifications.slack.enabled
             
-            # Generate report
-            report = self.backup_engine.generate_report(result)
+            # Run backup
+            result = self.backup_engine.run_backup(include_diff=notify)
             
-            # Send notifications
-            self.notifier.send_notifications(result, report)
+            if notify:
+                # Generate report
+                report = self.backup_engine.generate_report(result)
+                
+                # Send notifications
+                self.notifier.send_notifications(result, report)
             
             logger.info("Scheduled backup completed")
             
         except Exception as e:
-            logger.error(f"Error in scheduled backup: {str(e)}")
+            logger.error("Error in scheduled backup: %s", e)
+        finally:
+            # Mail servers drop idle sessions long before the next run
+            self.notifier.close()
     
     def run_once(self):
         """Run backup once immediately (for testing)"""
         logger.info("Running one-time backup...")
-        self._run_scheduled_backup()
\ No newline at end of file
+        try:
+            self._run_scheduled_backup()
+        finally:
+            # No later run will reuse the pooled sessions
+            self.backup_engine.close()
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Pool of reusable SSH sessions to network devices
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SSHConnectionPool:
+    """Keeps idle device connections open so later backups skip the SSH handshake"""
+    
+    def __init__(self, idle_ttl_seconds: int = 300, max_idle: int = 128):
+        """
+        Initialize connection pool
+        
+        Args:
+            idle_ttl_seconds: How long an idle connection is kept; 0 disables pooling
+            max_idle: Maximum number of idle connections; least recently used are closed first
+        """
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_idle = max_idle
+        # (hostname, username, port) -> (connection, expiry as time.monotonic()),
+        # least recently released first
+        self._idle: "OrderedDict[Tuple[str, Optional[str], int], Tuple[object, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Background thread closing expired connections, started on first release
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    @staticmethod
+    def _key(device) -> Tuple[str, Optional[str], int]:
+        """Pool key for a device"""
+        return (device.hostname, device.username, device.port)
+    
+    def acquire(self, device):
+        """
+        Take an idle connection for a device out of the pool
+        
+        Args:
+            device: Device configuration object
+        
+        Returns:
+            Live Netmiko connection, or None if none is available
+        """
+        with self._lock:
+            entry = self._idle.pop(self._key(device), None)
+        
+        if entry is None:
+            return None
+        
+        connection, expires = entry
+        if expires <= time.monotonic() or not self._is_alive(connection):
+            self._close(connection)
+            return None
+        
+        return connection
+    
+    def release(self, device, connection):
+        """
+        Return a connection to the pool for later reuse
+        
+        Args:
+            device: Device configuration object
+            connection: Netmiko connection to keep
+        """
+        if self.idle_ttl_seconds <= 0:
+            self._close(connection)
+            return
+        
+        evicted = []
+        
+        with self._lock:
+            previous = self._idle.pop(self._key(device), None)
+            if previous is not None:
+                evicted.append(previous[0])
+            self._idle[self._key(device)] = (connection, time.monotonic() + self.idle_ttl_seconds)
+            
+            while len(self._idle) > self.max_idle:
+                _, (idle_connection, _) = self._idle.popitem(last=False)
+                evicted.append(idle_connection)
+            
+            if self._reaper is None:
+                self._stop.clear()
+                self._reaper = threading.Thread(target=self._reap, name="ssh-pool-reaper", daemon=True)
+                self._reaper.start()
+        
+        for idle_connection in evicted:
+            self._close(idle_connection)
+    
+    def close_all(self):
+        """Close all idle connections and stop the reaper thread"""
+        with self._lock:
+            connections = [connection for connection, _ in self._idle.values()]
+            self._idle.clear()
+            reaper, self._reaper = self._reaper, None
+        
+        if reaper is not None:
+            self._stop.set()
+            reaper.join()
+        
+        for connection in connections:
+            self._close(connection)
+    
+    def _reap(self):
+        """Close connections that outlived their TTL until close_all() is called"""
+        interval = min(self.idle_ttl_seconds, 60)
+        
+        while not self._stop.wait(interval):
+            now = time.monotonic()
+            
+            with self._lock:
+                expired = [key for key, (_, expires) in self._idle.items() if expires <= now]
+                connections = [self._idle.pop(key)[0] for key in expired]
+            
+            for connection in connections:
+                self._close(connection)
+    
+    @staticmethod
+    def _is_alive(connection) -> bool:
+        """Check whether a pooled connection can still be used"""
+        try:
+            return connection.is_alive()
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _close(connection):
+        """Close a connection, ignoring errors"""
+        try:
+            connection.disconnect()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {str(e)}")
\ No newline at end of file
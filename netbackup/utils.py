@@ -2,14 +2,63 @@
 Utility functions and helpers
 """
 
+import atexit
 import logging
+import queue
 import sys
+from itertools import chain, zip_longest
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 
 from netbackup.config import LoggingSettings
 
+# Common Netmiko device types accepted by validate_device_type()
+_SUPPORTED_DEVICE_TYPES = frozenset({
+    'cisco_ios',
+    'cisco_xe',
+    'cisco_xr',
+    'cisco_nxos',
+    'cisco_asa',
+    'arista_eos',
+    'juniper_junos',
+    'hp_comware',
+    'hp_procurve',
+    'paloalto_panos',
+    'fortinet',
+    'checkpoint_gaia',
+    'dell_force10',
+    'avaya_ers',
+    'avaya_vsp',
+    'mikrotik_routeros',
+})
+
+# Background thread writing records to the log file, see setup_logging()
+_listener: Optional[QueueListener] = None
+
+# Units used by format_bytes(), one per power of 1024
+_BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Characters not allowed in filenames, each mapped to '_'
+_SANITIZE_TABLE = str.maketrans({char: '_' for char in '<>:"/\\|?*'})
+
+
+def _stop_listener():
+    """Flush queued records to the log file and close it"""
+    global _listener
+    
+    if _listener is None:
+        return
+    
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+# Runs before logging's own shutdown hook, so queued records still reach the file
+atexit.register(_stop_listener)
+
 
 def setup_logging(settings: LoggingSettings) -> logging.Logger:
     """
@@ -21,12 +70,15 @@ def setup_logging(settings: LoggingSettings) -> logging.Logger:
     Returns:
         Configured logger
     """
+    global _listener
+    
     # Create logger
     logger = logging.getLogger('netbackup')
     logger.setLevel(getattr(logging, settings.level.upper(), logging.INFO))
     
     # Clear any existing handlers
     logger.handlers.clear()
+    _stop_listener()
     
     # Create formatters
     detailed_formatter = logging.Formatter(
@@ -48,8 +100,9 @@ def setup_logging(settings: LoggingSettings) -> logging.Logger:
     # File handler with rotation
     if settings.file:
         # Create log directory if needed
-        log_path = Path(settings.file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_dir = Path(settings.file).parent
+        if not log_dir.is_dir():
+            log_dir.mkdir(parents=True, exist_ok=True)
         
         file_handler = RotatingFileHandler(
             settings.file,
@@ -58,7 +111,13 @@ def setup_logging(settings: LoggingSettings) -> logging.Logger:
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(detailed_formatter)
-        logger.addHandler(file_handler)
+        
+        # Device worker threads only enqueue records; a background thread does
+        # the disk writes and rotation
+        log_queue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        logger.addHandler(QueueHandler(log_queue))
     
     return logger
 
@@ -73,11 +132,12 @@ def format_bytes(bytes_size: int) -> str:
     Returns:
         Formatted string (e.g., "1.5 KB", "2.3 MB")
     """
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if bytes_size < 1024.0:
-            return f"{bytes_size:.1f} {unit}"
-        bytes_size /= 1024.0
-    return f"{bytes_size:.1f} TB"
+    if bytes_size < 1024:
+        return f"{bytes_size:.1f} B"
+    
+    # Each unit spans 10 bits, so the bit length picks the unit directly
+    index = min((int(bytes_size).bit_length() - 1) // 10, len(_BYTE_UNITS) - 1)
+    return f"{bytes_size / (1 << (index * 10)):.1f} {_BYTE_UNITS[index]}"
 
 
 def format_duration(seconds: float) -> str:
@@ -114,27 +174,7 @@ def validate_device_type(device_type: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    # Common supported device types
-    supported_types = [
-        'cisco_ios',
-        'cisco_xe',
-        'cisco_xr',
-        'cisco_nxos',
-        'cisco_asa',
-        'arista_eos',
-        'juniper_junos',
-        'hp_comware',
-        'hp_procurve',
-        'paloalto_panos',
-        'fortinet',
-        'checkpoint_gaia',
-        'dell_force10',
-        'avaya_ers',
-        'avaya_vsp',
-        'mikrotik_routeros',
-    ]
-    
-    return device_type.lower() in supported_types
+    return device_type.lower() in _SUPPORTED_DEVICE_TYPES
 
 
 def truncate_string(text: str, max_length: int = 100, suffix: str = "...") -> str:
@@ -165,35 +205,26 @@ def create_summary_table(headers: list, rows: list) -> str:
     Returns:
         Formatted table as string
     """
-    # Calculate column widths
-    col_widths = [len(h) for h in headers]
+    # Stringify every cell once
+    str_rows = [[str(cell) for cell in row] for row in rows]
     
-    for row in rows:
-        for i, cell in enumerate(row):
-            col_widths[i] = max(col_widths[i], len(str(cell)))
+    # Calculate column widths from the transposed table (header included)
+    col_widths = [max(map(len, col)) for col in zip_longest(headers, *str_rows, fillvalue='')]
     
     # Create separator
     separator = "+" + "+".join("-" * (w + 2) for w in col_widths) + "+"
     
     # Format header
-    header_row = "|" + "|".join(
-        f" {h.ljust(col_widths[i])} " for i, h in enumerate(headers)
-    ) + "|"
+    header_row = "| " + " | ".join(h.ljust(w) for h, w in zip(headers, col_widths)) + " |"
     
     # Format rows
-    table_rows = []
-    for row in rows:
-        table_row = "|" + "|".join(
-            f" {str(cell).ljust(col_widths[i])} " for i, cell in enumerate(row)
-        ) + "|"
-        table_rows.append(table_row)
-    
-    # Combine
-    lines = [separator, header_row, separator]
-    lines.extend(table_rows)
-    lines.append(separator)
+    table_rows = (
+        "| " + " | ".join(cell.ljust(w) for cell, w in zip(row, col_widths)) + " |"
+        for row in str_rows
+    )
     
-    return "\n".join(lines)
+    # Combine in a single join
+    return "\n".join(chain((separator, header_row, separator), table_rows, (separator,)))
 
 
 def check_credentials(username: Optional[str], password: Optional[str]) -> tuple:
@@ -226,9 +257,5 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename
     """
-    # Remove or replace invalid characters
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        filename = filename.replace(char, '_')
-    
-    return filename
\ No newline at end of file
+    # Replace invalid characters in a single pass
+    return filename.translate(_SANITIZE_TABLE)
\ No newline at end of file